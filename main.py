@@ -3,31 +3,34 @@
 """
 extract_word_tables.py
 批量从目录中的 Word (.docx) 文档提取表格、清洗字段并导出 Excel。
-- 使用内置 pipeline 直接读取 .docx → 结构化 JSON → 表格清洗 → 字段字典
+- 使用内置 pipeline 直接读取 .docx → 第一张表格 → 字段字典（单次流式解析）
 - 对“服从分配”前的复选框/勾勾逻辑使用统一的 is_checked_text 判断
 - 保留调试开关以产生详细日志
 
 依赖:
-    pip install pandas openpyxl
+    pip install openpyxl
+    pip install lxml  # 可选，解析 docx XML 更快
 注意:
     - 仅支持 .docx（.doc 需先另存为 .docx）
 """
 
 # keep os for file ops
 import os
+import sys
 import logging
 import argparse
 import zipfile
-import tempfile
-import json
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from io import BytesIO
+from typing import List, Tuple, Union
 
-import pandas as pd
+from openpyxl import Workbook
 
-from src.read_docx import extract_structure
-from src.extract_tables import extract_tables
-from src.clean_table_dicts import clean_tables
+from src.json_utils import dumps, loads
+from src.parse_resume import parse_resume_docx
 from src.constants import VERSION
 
 # 可配置：输入文件夹与输出文件名（可在运行时通过设置菜单修改）
@@ -38,22 +41,33 @@ OUTPUT_XLSX = 'output.xlsx'
 CONFIG_PATH = 'config.json'
 
 
+@functools.lru_cache(maxsize=1)
+def _read_config(path: str, mtime: float) -> dict:
+    # mtime 作为缓存键的一部分：文件未变化时不再重复打开与解析
+    try:
+        with open(path, 'rb') as fh:
+            return loads(fh.read())
+    except Exception:
+        return {}
+
+
 def load_config(path: str = CONFIG_PATH) -> dict:
-    if os.path.exists(path):
-        try:
-            with open(path, 'r', encoding='utf-8') as fh:
-                return json.load(fh)
-        except Exception:
-            return {}
-    return {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    # 返回副本，调用方修改不会污染缓存
+    return dict(_read_config(path, mtime))
 
 
 def save_config(cfg: dict, path: str = CONFIG_PATH) -> None:
     try:
-        with open(path, 'w', encoding='utf-8') as fh:
-            json.dump(cfg, fh, ensure_ascii=False, indent=2)
+        with open(path, 'wb') as fh:
+            fh.write(dumps(cfg))
     except Exception:
         pass
+    finally:
+        _read_config.cache_clear()
 
 
 # 从持久化配置中加载初始值（若存在）
@@ -87,29 +101,36 @@ COLUMNS = [
     "曾获奖项及获奖时间",
     "个人优势分析及简要工作设想",
 ]
+# 与 clean_table_dicts 中的字段名一样驻留（intern），字典查找可走同一对象的快速比较
+COLUMNS = tuple(sys.intern(col) for col in COLUMNS)
+# 列名 → 行内下标，行数据直接按列顺序存为 list
+COLUMN_INDEX = {col: idx for idx, col in enumerate(COLUMNS)}
+
+
+def empty_row(filename: str) -> List[str]:
+    row = [""] * len(COLUMNS)
+    row[COLUMN_INDEX["文件名"]] = filename
+    return row
+
+def process_docx_file(filename: str, source: Union[str, bytes]) -> Tuple[str, List[str], str]:
+    """Run the docx → table extraction → dictionary cleaner pipeline.
 
-def process_docx_file(path: str) -> Dict[str, str]:
-    """Run the docx → table extraction → dictionary cleaner pipeline."""
-    filename = os.path.basename(path)
-    result = {col: "" for col in COLUMNS}
-    result["文件名"] = filename
+    source 为 docx 路径，或 zip 内 docx 的原始字节（无需先解压到磁盘）。
+    在子进程中执行，因此不直接写日志：返回 (文件名, 行数据, 错误信息)，由主进程统一记录。
+    """
+    result = empty_row(filename)
     try:
-        structure = extract_structure(path)
-        tables = extract_tables(structure)
-        cleaned = clean_tables({"tables": tables})
-        if cleaned:
-            # prefer the first table entry
-            entry = cleaned[0]
-            for key, value in entry.items():
-                if key in result and value:
-                    result[key] = value
+        if isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        # 单次流式解析：只读取第一张表格并直接映射为字段字典
+        entry = parse_resume_docx(source)
+        for key, value in entry.items():
+            idx = COLUMN_INDEX.get(key)
+            if idx is not None and value:
+                result[idx] = value
     except Exception as exc:
-        if DEBUG_MODE and logger:
-            logger.debug(f"提取 {filename} 时出错: {exc}")
-        return result
-    if DEBUG_MODE and logger:
-        logger.debug(f"{filename} -> {result}")
-    return result
+        return filename, result, str(exc)
+    return filename, result, ""
 
 
 def setup_logger(debug_mode: bool):
@@ -165,44 +186,52 @@ def process_files(debug_mode: bool):
     global logger
     logger = setup_logger(debug_mode)
     
-    rows: List[Dict[str, str]] = []
+    rows: List[List[str]] = []
 
     if not os.path.isdir(INPUT_FOLDER):
         logger.error(f"输入目录不存在: {INPUT_FOLDER}")
         return
 
-    # 使用一个临时目录来解压 zip 文件中的 docx
-    with tempfile.TemporaryDirectory() as tmpdir:
-        docx_paths: List[str] = []
+    # (文件名, 路径或 zip 内 docx 的字节)；zip 内的 docx 直接读入内存，不再解压到临时目录
+    docx_sources: List[Tuple[str, Union[str, bytes]]] = []
 
-        # 遍历输入文件夹，收集 .docx 文件并解压 zip 中的 docx
-        for entry in os.listdir(INPUT_FOLDER):
-            full = os.path.join(INPUT_FOLDER, entry)
-            if entry.lower().endswith('.docx') and os.path.isfile(full):
-                docx_paths.append(full)
-            elif entry.lower().endswith('.zip') and os.path.isfile(full):
-                try:
-                    with zipfile.ZipFile(full, 'r') as zf:
-                        for zi in zf.infolist():
-                            if zi.filename.lower().endswith('.docx'):
-                                extracted = zf.extract(zi, path=tmpdir)
-                                docx_paths.append(extracted)
-                except Exception as e:
-                    logger.error(f"无法读取 zip 文件: {entry}，错误: {e}")
-
-        if not docx_paths:
-            logger.info(f"未找到任何 .docx 文件（包括 zip 内）于目录: {INPUT_FOLDER}")
-            return
+    # 遍历输入文件夹，收集 .docx 文件并读取 zip 中的 docx
+    for entry in os.listdir(INPUT_FOLDER):
+        full = os.path.join(INPUT_FOLDER, entry)
+        if entry.lower().endswith('.docx') and os.path.isfile(full):
+            docx_sources.append((entry, full))
+        elif entry.lower().endswith('.zip') and os.path.isfile(full):
+            try:
+                with zipfile.ZipFile(full, 'r') as zf:
+                    for zi in zf.infolist():
+                        if zi.filename.lower().endswith('.docx'):
+                            name = os.path.basename(zi.filename)
+                            docx_sources.append((name, zf.read(zi)))
+            except Exception as e:
+                logger.error(f"无法读取 zip 文件: {entry}，错误: {e}")
 
-        logger.info(f"\n找到 {len(docx_paths)} 个 docx 待处理（含 zip 内）\n")
+    if not docx_sources:
+        logger.info(f"未找到任何 .docx 文件（包括 zip 内）于目录: {INPUT_FOLDER}")
+        return
 
-        for path in docx_paths:
-            fname = os.path.basename(path)
+    logger.info(f"\n找到 {len(docx_sources)} 个 docx 待处理（含 zip 内）\n")
+
+    # 各文件互相独立，使用多进程并行处理；结果按原顺序收集，日志只在主进程写入
+    # Windows 下 ProcessPoolExecutor 最多支持 61 个工作进程
+    cpu_limit = 61 if sys.platform == "win32" else (os.cpu_count() or 1)
+    max_workers = min(len(docx_sources), os.cpu_count() or 1, cpu_limit)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(process_docx_file, name, source)
+            for name, source in docx_sources
+        ]
+        for (fname, _), future in zip(docx_sources, futures):
             try:
-                row = process_docx_file(path)
-                if not row:
-                    row = {col: "" for col in COLUMNS}
-                    row["文件名"] = fname
+                fname, row, error = future.result()
+                if error and debug_mode:
+                    logger.debug(f"提取 {fname} 时出错: {error}")
+                elif debug_mode:
+                    logger.debug(f"{fname} -> {dict(zip(COLUMNS, row))}")
                 rows.append(row)
                 logger.info(f"✓ 已处理: {fname}")
             except Exception as e:
@@ -211,11 +240,8 @@ def process_files(debug_mode: bool):
                 if debug_mode:
                     import traceback
                     logger.debug(traceback.format_exc())
-                row = {col: "" for col in COLUMNS}
-                row["文件名"] = fname
-                rows.append(row)
+                rows.append(empty_row(fname))
 
-    df = pd.DataFrame(rows, columns=COLUMNS)
     # 在写入前确保输出目录存在（如果用户通过设置输入了带目录的输出路径）
     out_dir = os.path.dirname(OUTPUT_XLSX)
     if out_dir:
@@ -225,7 +251,13 @@ def process_files(debug_mode: bool):
             logger.error(f"无法创建输出目录 {out_dir}：{e}")
             logger.error("请检查输出路径设置并重试。")
             return
-    df.to_excel(OUTPUT_XLSX, index=False)
+    # write_only 模式逐行流式写入，无需先构建 DataFrame
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(COLUMNS)
+    for row in rows:
+        ws.append(row)
+    wb.save(OUTPUT_XLSX)
     logger.info(f"\n{'='*50}")
     logger.info(f"完成！结果已保存到: {OUTPUT_XLSX}")
     logger.info(f"共处理 {len(rows)} 个文件")
@@ -313,4 +345,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # PyInstaller 打包后的可执行文件需要此调用，子进程才能正常启动
+    multiprocessing.freeze_support()
     main()
@@ -1,12 +1,26 @@
 import argparse
-import json
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Sequence
-
-CHECKED_CHARS = set("☑☒✓✔√■●▣◆▲")
-UNCHECKED_CHARS = set("☐□▢◻")
+from typing import Container, Dict, List, Sequence, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # optional: fall back to plain substring scans
+    ahocorasick = None
+
+try:
+    from src.json_utils import dumps, loads
+except ImportError:  # run as a script from inside src/
+    from json_utils import dumps, loads
+
+CHECKED_CHARS = frozenset("☑☒✓✔√■●▣◆▲")
+UNCHECKED_CHARS = frozenset("☐□▢◻")
+_CHECKBOX_CHARS = CHECKED_CHARS | UNCHECKED_CHARS
+_SPECIAL_MARKS = frozenset("■●▣◆")
+_AFFIRMATIVE_TEXTS = frozenset({"是", "同意", "接受", "✔", "☑", "√", "✓"})
+_NEGATIVE_TEXTS = frozenset({"否", "不同意", "不接受"})
 LABEL_KEYWORDS = ["服从调剂", "服从分配", "调剂", "分配"]
 
 FIELD_KEYWORDS: Sequence[tuple[str, Sequence[str]]] = [
@@ -36,12 +50,25 @@ FIELD_KEYWORDS: Sequence[tuple[str, Sequence[str]]] = [
     ),
     ("服从分配", ["服从分配", "服从调剂"]),
 ]
+# intern field names so main.COLUMNS and the cleaned dict keys share one object each
+FIELD_KEYWORDS = [(sys.intern(field), keywords) for field, keywords in FIELD_KEYWORDS]
 
 ALL_LABEL_KEYWORDS = [
     keyword.replace(" ", "")
     for _, keywords in FIELD_KEYWORDS
     for keyword in keywords
 ]
+_KEYWORDS_NOSPACE: Dict[str, str] = {
+    keyword: keyword.replace(" ", "")
+    for _, keywords in FIELD_KEYWORDS
+    for keyword in keywords
+}
+
+# flattened once for the clean_rows hot loop: (field, keywords, space-free keywords)
+_FIELD_TABLE: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = tuple(
+    (field, tuple(keywords), tuple(_KEYWORDS_NOSPACE[k] for k in keywords))
+    for field, keywords in FIELD_KEYWORDS
+)
 
 LABEL_PREFIX_CHARS = (
     "".join(CHECKED_CHARS)
@@ -50,23 +77,69 @@ LABEL_PREFIX_CHARS = (
 )
 LABEL_SUFFIX_CHARS = set(":：-—_/.,()[]（）·•")
 
+_WS_RE = re.compile(r"[\r\n\s]+")
+_HAN_RE = re.compile(r"[\u4e00-\u9fff]")
+
+
+def _compile_inline_pattern(keyword: str) -> re.Pattern[str]:
+    return re.compile(fr"{re.escape(keyword)}\s*[:：]\s*(.+)")
+
+
+_INLINE_PATTERNS: Dict[str, re.Pattern[str]] = {
+    keyword: _compile_inline_pattern(keyword)
+    for _, keywords in FIELD_KEYWORDS
+    for keyword in keywords
+}
+
+
+def _build_label_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in ALL_LABEL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_LABEL_AUTOMATON = _build_label_automaton()
+
+
+@lru_cache(maxsize=4096)
+def label_keyword_hits(normalized: str) -> Tuple[Tuple[int, str], ...]:
+    """Return (start, keyword) for every label keyword in a space-free string.
+
+    Requires pyahocorasick; one linear scan replaces a substring test per keyword.
+    """
+    return tuple(
+        (end - len(keyword) + 1, keyword)
+        for end, keyword in _LABEL_AUTOMATON.iter(normalized)
+    )
+
+
+def _nospace(keyword: str) -> str:
+    compact = _KEYWORDS_NOSPACE.get(keyword)
+    return compact if compact is not None else keyword.replace(" ", "")
+
 
 def load_json(path: str) -> Dict:
     if path == "-":
         raw = sys.stdin.read()
     else:
-        raw = Path(path).read_text(encoding="utf-8")
-    return json.loads(raw)
+        raw = Path(path).read_bytes()
+    return loads(raw)
 
 
 def normalize_text(value: str) -> str:
     if not value:
         return ""
-    return re.sub(r"[\r\n\s]+", " ", value).strip()
+    return _WS_RE.sub(" ", value).strip()
 
 
 def extract_inline_value(text: str, keyword: str) -> str | None:
-    pattern = re.compile(fr"{re.escape(keyword)}\s*[:：]\s*(.+)")
+    pattern = _INLINE_PATTERNS.get(keyword)
+    if pattern is None:
+        pattern = _compile_inline_pattern(keyword)
     match = pattern.search(text)
     if match:
         return match.group(1).strip()
@@ -77,30 +150,25 @@ def is_checked_text(text: str) -> bool:
     if not text:
         return False
     t = text.strip()
-    is_label_text = any(k in t for k in LABEL_KEYWORDS)
-
-    for ch in t:
-        if ch in CHECKED_CHARS:
-            return True
-        if ch in UNCHECKED_CHARS:
-            return False
+    if not _CHECKBOX_CHARS.isdisjoint(t):
+        # the first checkbox symbol decides, e.g. "□是 ■否" is unchecked
+        for ch in t:
+            if ch in CHECKED_CHARS:
+                return True
+            if ch in UNCHECKED_CHARS:
+                return False
 
     if len(t) <= 3:
-        if t in ["是", "同意", "接受", "✔", "☑", "√", "✓"]:
+        if t in _AFFIRMATIVE_TEXTS:
             return True
-        if t in ["否", "不同意", "不接受"]:
+        if t in _NEGATIVE_TEXTS:
             return False
 
-    if is_label_text:
+    if any(k in t for k in LABEL_KEYWORDS):
         return False
 
-    non_alnum = sum(
-        1
-        for ch in t
-        if not ch.isalnum() and not ch.isspace() and "\u4e00" <= ch <= "\u9fff"
-    )
-    if non_alnum >= 1 and len(t) <= 4:
-        if any(ch in t for ch in "■●▣◆"):
+    if len(t) <= 4 and _HAN_RE.search(t):
+        if not _SPECIAL_MARKS.isdisjoint(t):
             return True
     return False
 
@@ -108,19 +176,34 @@ def is_checked_text(text: str) -> bool:
 def interpret_checkbox(text: str) -> str:
     if is_checked_text(text):
         return "是"
-    if any(ch in text for ch in UNCHECKED_CHARS):
+    if not UNCHECKED_CHARS.isdisjoint(text):
         return "否"
     return ""
 
 
-def contains_label_keyword(text: str, allowed_keywords: Sequence[str] | None = None) -> bool:
-    normalized = text.replace(" ", "")
+def contains_label_keyword(
+    text: str,
+    allowed_keywords: Sequence[str] | None = None,
+    text_nospace: str | None = None,
+) -> bool:
+    normalized = text.replace(" ", "") if text_nospace is None else text_nospace
     trimmed = normalized.lstrip(LABEL_PREFIX_CHARS)
     if not trimmed:
         return False
+    excluded = {_nospace(kw) for kw in allowed_keywords or ()}
+
+    if _LABEL_AUTOMATON is not None:
+        offset = len(normalized) - len(trimmed)
+        for start, keyword in label_keyword_hits(normalized):
+            if start != offset or keyword in excluded:
+                continue
+            remainder = trimmed[len(keyword):]
+            if all(ch in LABEL_SUFFIX_CHARS for ch in remainder):
+                return True
+        return False
 
     for keyword in ALL_LABEL_KEYWORDS:
-        if allowed_keywords and any(keyword == kw.replace(" ", "") for kw in allowed_keywords):
+        if keyword in excluded:
             continue
         if not trimmed.startswith(keyword):
             continue
@@ -135,66 +218,105 @@ def contains_label_keyword(text: str, allowed_keywords: Sequence[str] | None = N
 
 
 def infer_value_from_adjacent(
-    rows: List[List[str]], row_idx: int, col_idx: int, allowed_keywords: Sequence[str] | None = None
+    rows: List[List[str]],
+    row_idx: int,
+    col_idx: int,
+    allowed_keywords: Sequence[str] | None = None,
+    nospace_rows: List[List[str]] | None = None,
 ) -> str:
+    # rows come from clean_rows() and are already normalize_text()-ed;
+    # nospace_rows, when given, holds the same cells with spaces removed
     row = rows[row_idx]
     # try to the right
     for cc in range(col_idx + 1, len(row)):
-        candidate = normalize_text(row[cc])
-        if candidate and not contains_label_keyword(candidate, allowed_keywords):
+        candidate = row[cc]
+        if not candidate:
+            continue
+        compact = nospace_rows[row_idx][cc] if nospace_rows is not None else None
+        if not contains_label_keyword(candidate, allowed_keywords, compact):
             return candidate
     # try below in same column
     for rr in range(row_idx + 1, len(rows)):
         if col_idx < len(rows[rr]):
-            candidate = normalize_text(rows[rr][col_idx])
-            if candidate and not contains_label_keyword(candidate, allowed_keywords):
+            candidate = rows[rr][col_idx]
+            if not candidate:
+                continue
+            compact = nospace_rows[rr][col_idx] if nospace_rows is not None else None
+            if not contains_label_keyword(candidate, allowed_keywords, compact):
                 return candidate
     return ""
 
 
-def match_field(value: str, keywords: Sequence[str]) -> str:
-    normalized = value.replace(" ", "")
-    for keyword in keywords:
-        if keyword.replace(" ", "") in normalized:
+def _first_keyword(
+    haystack: Container[str], keywords: Sequence[str], keywords_nospace: Sequence[str]
+) -> str:
+    """Return the first keyword whose space-free form is in haystack.
+
+    haystack is either the space-free cell text (substring test) or the set of
+    automaton hits for that text (membership test).
+    """
+    for keyword, compact in zip(keywords, keywords_nospace):
+        if compact in haystack:
             return keyword
     return ""
 
 
+def match_field(value: str, keywords: Sequence[str], value_nospace: str | None = None) -> str:
+    normalized = value.replace(" ", "") if value_nospace is None else value_nospace
+    return _first_keyword(normalized, keywords, [_nospace(keyword) for keyword in keywords])
+
+
 def clean_table(table: Dict) -> Dict[str, str]:
     rows = table.get("cells", [])
-    normalized_rows = [[normalize_text(cell) for cell in row] for row in rows]
+    return clean_rows([[normalize_text(cell) for cell in row] for row in rows])
+
+
+def clean_rows(normalized_rows: List[List[str]]) -> Dict[str, str]:
+    """Map a grid of normalize_text()-ed cells to the target fields."""
     cleaned = {field: "" for field, _ in FIELD_KEYWORDS}
+    # fields still waiting for a value; shrinks as they fill so later cells scan less
+    unfilled = list(_FIELD_TABLE)
+    # strip spaces once per cell instead of once per keyword test
+    nospace_rows = [[cell.replace(" ", "") for cell in row] for row in normalized_rows]
 
     for r_idx, row in enumerate(normalized_rows):
         for c_idx, text in enumerate(row):
             if not text:
                 continue
-            for field, keywords in FIELD_KEYWORDS:
-                if cleaned[field]:
-                    continue
-                matched_keyword = match_field(text, keywords)
+            text_nospace = nospace_rows[r_idx][c_idx]
+            # with the automaton, test keywords against the cell's hit set
+            # (one scan per cell); otherwise as substrings
+            haystack: Container[str]
+            if _LABEL_AUTOMATON is not None:
+                haystack = {keyword for _, keyword in label_keyword_hits(text_nospace)}
+            else:
+                haystack = text_nospace
+            for index, (field, keywords, keywords_nospace) in enumerate(unfilled):
+                matched_keyword = _first_keyword(haystack, keywords, keywords_nospace)
                 if not matched_keyword:
                     continue
                 value = extract_inline_value(text, matched_keyword)
                 if not value:
                     value = infer_value_from_adjacent(
-                        normalized_rows, r_idx, c_idx, keywords
+                        normalized_rows, r_idx, c_idx, keywords, nospace_rows
                     )
                 if field == "服从分配":
                     checkbox = interpret_checkbox(text)
-                    if checkbox:
-                        cleaned[field] = checkbox
-                        break
-                    checkbox = infer_value_from_adjacent(normalized_rows, r_idx, c_idx)
-                    if checkbox:
-                        cleaned[field] = interpret_checkbox(checkbox) or checkbox
-                        break
-                    if value:
-                        cleaned[field] = interpret_checkbox(value) or value
-                        break
+                    if not checkbox:
+                        adjacent = infer_value_from_adjacent(
+                            normalized_rows, r_idx, c_idx, nospace_rows=nospace_rows
+                        )
+                        if adjacent:
+                            checkbox = interpret_checkbox(adjacent) or adjacent
+                        elif value:
+                            checkbox = interpret_checkbox(value) or value
+                    value = checkbox
                 if value:
                     cleaned[field] = value
+                    del unfilled[index]
                     break
+            if not unfilled:
+                return cleaned
     return cleaned
 
 
@@ -236,12 +358,12 @@ def main() -> None:
     if args.debug:
         print(render_debug(cleaned))
 
-    payload = json.dumps({"entries": cleaned}, ensure_ascii=False, indent=2)
+    payload = dumps({"entries": cleaned})
     if args.output:
-        Path(args.output).write_text(payload, encoding="utf-8")
+        Path(args.output).write_bytes(payload)
         print(f"Cleaned dictionaries written to {args.output}")
     else:
-        print(payload)
+        print(payload.decode("utf-8"))
 
 
 if __name__ == "__main__":
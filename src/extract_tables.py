@@ -1,39 +1,44 @@
 import argparse
-import json
 import sys
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Sequence
 
+try:
+    from src.json_utils import dumps, loads
+except ImportError:  # run as a script from inside src/
+    from json_utils import dumps, loads
+
 
 def load_structure_from_source(source: str) -> Dict[str, Any]:
     if source == "-":
         raw = sys.stdin.read()
     else:
-        raw = Path(source).read_text(encoding="utf-8")
-    return json.loads(raw)
+        raw = Path(source).read_bytes()
+    return loads(raw)
 
 
 def normalized_cell_text(cell: Dict[str, Any]) -> str:
     text = cell.get("text", "")
     if not text:
-        paragraphs: Iterable[Dict[str, Any]] = cell.get("paragraphs", [])
-        text = "\n".join(p.get("text", "") for p in paragraphs if p.get("text"))
+        paragraphs: Iterable[Dict[str, Any]] = cell.get("paragraphs", ())
+        text = " ".join(p["text"] for p in paragraphs if p.get("text"))
+    # runs may still carry <w:br/> newlines
     return text.replace("\n", " ").strip()
 
 
 def trim_trailing_empty(cells: List[str]) -> List[str]:
-    trimmed = cells[:]
-    while trimmed and trimmed[-1] == "":
-        trimmed.pop()
-    return trimmed
+    # scan back to the last non-empty cell and slice once
+    end = len(cells)
+    while end > 0 and cells[end - 1] == "":
+        end -= 1
+    return cells[:end]
 
 
 def normalize_table(table_block: Dict[str, Any]) -> Dict[str, Any]:
     rows: List[List[str]] = []
     max_cols = 0
     for row in table_block.get("rows", []):
-        normalized_row = [normalized_cell_text(cell) for cell in row]
-        normalized_row = trim_trailing_empty(normalized_row)
+        normalized_row = trim_trailing_empty([normalized_cell_text(cell) for cell in row])
         rows.append(normalized_row)
         max_cols = max(max_cols, len(normalized_row))
     return {
@@ -90,12 +95,12 @@ def main() -> None:
             print(f"Table {index}: {render_table_grid(table)}")
             print("---")
 
-    payload = json.dumps({"tables": tables}, ensure_ascii=False, indent=2)
+    payload = dumps({"tables": tables})
     if args.output:
-        Path(args.output).write_text(payload, encoding="utf-8")
+        Path(args.output).write_bytes(payload)
         print(f"Cleaned tables written to {args.output}")
     else:
-        print(payload)
+        print(payload.decode("utf-8"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard json module
+    orjson = None
+
+
+def dumps(data: Any, indent: int | None = 2) -> bytes:
+    """Serialize to UTF-8 JSON bytes, keeping non-ASCII text as is."""
+    # orjson only supports two-space indentation
+    if orjson is not None and indent == 2:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
+
+
+def loads(raw: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
@@ -0,0 +1,51 @@
+import argparse
+from typing import Dict
+
+try:
+    from src.clean_table_dicts import clean_rows, normalize_text
+    from src.extract_tables import trim_trailing_empty
+    from src.json_utils import dumps
+    from src.read_docx import DocxSource, iter_table_texts
+except ImportError:  # run as a script from inside src/
+    from clean_table_dicts import clean_rows, normalize_text
+    from extract_tables import trim_trailing_empty
+    from json_utils import dumps
+    from read_docx import DocxSource, iter_table_texts
+
+
+def parse_resume_docx(source: DocxSource) -> Dict[str, str]:
+    """Fused read_docx → extract_tables → clean_table for the first table of a docx.
+
+    Streams the document XML, turns the first top-level table straight into
+    normalized cell text and maps it to fields, without building the
+    intermediate structure / table JSON. Returns {} when the docx has no table.
+    """
+    tables = iter_table_texts(source)
+    try:
+        rows = next(tables, None)
+    finally:
+        tables.close()
+    if rows is None:
+        return {}
+    normalized_rows = [
+        trim_trailing_empty([normalize_text(cell) for cell in row]) for row in rows
+    ]
+    return clean_rows(normalized_rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Parse the first table of a resume docx directly into labeled fields."
+    )
+    parser.add_argument(
+        "source",
+        help="Path to a .docx file or an extracted docx folder (containing word/document.xml).",
+    )
+    args = parser.parse_args()
+
+    cleaned = parse_resume_docx(args.source)
+    print(dumps(cleaned).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,51 @@
 import argparse
-import json
 import os
 import zipfile
-import xml.etree.ElementTree as ET
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Union
+from typing import IO, Any, Dict, Iterable, Iterator, List, Union
+
+try:
+    from lxml import etree as ET
+
+    # drop comments / PIs like xml.etree does, so both parsers yield the same tree
+    _ITERPARSE_OPTIONS: Dict[str, Any] = {
+        "huge_tree": True,
+        "remove_comments": True,
+        "remove_pis": True,
+    }
+except ImportError:  # fall back to the standard library parser
+    import xml.etree.ElementTree as ET
+
+    _ITERPARSE_OPTIONS = {}
+
+try:
+    from src.json_utils import dumps
+except ImportError:  # run as a script from inside src/
+    from json_utils import dumps
+
+# a .docx path, an extracted docx folder, or an opened binary stream (e.g. BytesIO)
+DocxSource = Union[str, Path, IO[bytes]]
 
 NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
 
+# fully qualified tags, compared against node.tag directly instead of strip_ns()
+_W = NS["w"]
+_BODY = f"{{{_W}}}body"
+_P = f"{{{_W}}}p"
+_R = f"{{{_W}}}r"
+_TBL = f"{{{_W}}}tbl"
+_TR = f"{{{_W}}}tr"
+_TC = f"{{{_W}}}tc"
+_TAB = f"{{{_W}}}tab"
+_T = frozenset({f"{{{_W}}}t", f"{{{_W}}}delText", f"{{{_W}}}instrText"})
+_BR = frozenset({f"{{{_W}}}br", f"{{{_W}}}cr"})
+_VAL = f"{{{_W}}}val"
+
 
 def strip_ns(tag: str) -> str:
-    if tag is None:
+    # lxml entity / comment nodes carry a non-string tag
+    if not isinstance(tag, str):
         return ""
     if tag.startswith("{"):
         return tag.split("}", 1)[1]
@@ -20,40 +55,68 @@ def strip_ns(tag: str) -> str:
 def collect_text(element: ET.Element) -> str:
     pieces: List[str] = []
     for node in element.iter():
-        tag = strip_ns(node.tag)
-        if tag in {"t", "delText", "instrText"} and node.text:
-            pieces.append(node.text)
-        elif tag == "tab":
+        tag = node.tag
+        if tag in _T:
+            if node.text:
+                pieces.append(node.text)
+        elif tag == _TAB:
             pieces.append("\t")
-        elif tag in {"br", "cr"}:
+        elif tag in _BR:
             pieces.append("\n")
     return "".join(pieces)
 
 
-def build_paragraph(paragraph: ET.Element) -> Dict[str, Any]:
+def paragraph_runs(paragraph: ET.Element) -> List[str]:
     runs: List[str] = []
-    for run in paragraph.findall("w:r", NS):
+    for run in paragraph:
+        if run.tag != _R:
+            continue
         text = collect_text(run)
         if text:
             runs.append(text)
+    return runs
+
+
+def paragraph_text(paragraph: ET.Element) -> str:
+    runs = paragraph_runs(paragraph)
+    return "".join(runs) if runs else collect_text(paragraph)
+
+
+def build_paragraph(paragraph: ET.Element, compact: bool = False) -> Dict[str, Any]:
+    if compact:
+        return {"type": "paragraph", "text": paragraph_text(paragraph)}
+    runs = paragraph_runs(paragraph)
     text = "".join(runs) if runs else collect_text(paragraph)
     ppr = paragraph.find("w:pPr", NS)
     style = None
     if ppr is not None:
         pstyle = ppr.find("w:pStyle", NS)
         if pstyle is not None:
-            style = pstyle.attrib.get(f"{{{NS['w']}}}val")
+            style = pstyle.attrib.get(_VAL)
     return {"type": "paragraph", "style": style, "text": text, "runs": runs}
 
 
-def build_table(table: ET.Element) -> Dict[str, Any]:
+def build_table(table: ET.Element, compact: bool = False) -> Dict[str, Any]:
+    """Build a table block; compact cells keep only ``text`` (all extract_tables reads)."""
     rows: List[List[Dict[str, Any]]] = []
-    for row in table.findall("w:tr", NS):
+    # walk direct children once instead of nested findall() passes
+    for row in table:
+        if row.tag != _TR:
+            continue
         cells: List[Dict[str, Any]] = []
-        for cell in row.findall("w:tc", NS):
-            paragraphs: List[Dict[str, Any]] = []
-            for paragraph in cell.findall("w:p", NS):
-                paragraphs.append(build_paragraph(paragraph))
+        for cell in row:
+            if cell.tag != _TC:
+                continue
+            if compact:
+                texts = [paragraph_text(p) for p in cell if p.tag == _P]
+                cell_text = "\n".join(t for t in texts if t).strip()
+                cells.append({"text": cell_text})
+                continue
+            paragraphs: List[Dict[str, Any]] = [
+                build_paragraph(paragraph)
+                for paragraph in cell
+                if paragraph.tag == _P
+            ]
             cell_text = "\n".join(
                 p["text"] for p in paragraphs if p.get("text")
             ).strip()
@@ -68,38 +131,81 @@ def build_table(table: ET.Element) -> Dict[str, Any]:
     }
 
 
-def read_blocks(body: ET.Element) -> List[Dict[str, Any]]:
-    blocks: List[Dict[str, Any]] = []
-    for child in body:
-        tag = strip_ns(child.tag)
-        if tag == "p":
-            blocks.append(build_paragraph(child))
-        elif tag == "tbl":
-            blocks.append(build_table(child))
-    return blocks
+BLOCK_BUILDERS = {_P: build_paragraph, _TBL: build_table}
+
+
+def read_document_xml(path: DocxSource) -> bytes:
+    # read the whole entry at once so the parser works on one contiguous buffer
+    if isinstance(path, (str, os.PathLike)) and os.path.isdir(path):
+        return (Path(path) / "word" / "document.xml").read_bytes()
+    with zipfile.ZipFile(path) as archive:
+        return archive.read("word/document.xml")
+
+
+def open_document_xml(path: DocxSource) -> IO[bytes]:
+    return BytesIO(read_document_xml(path))
+
+
+def iter_body_elements(source: DocxSource) -> Iterator[ET.Element]:
+    """Stream top-level body children, clearing each one after the consumer is done."""
+    depth = 0
+    in_body = False
+    found_body = False
+    with open_document_xml(source) as doc:
+        for event, elem in ET.iterparse(doc, events=("start", "end"), **_ITERPARSE_OPTIONS):
+            if event == "start":
+                depth += 1
+                if depth == 2 and elem.tag == _BODY:
+                    in_body = found_body = True
+                continue
+            if in_body and depth == 3:
+                yield elem
+                elem.clear()
+            elif depth == 2:
+                in_body = False
+            depth -= 1
+    if not found_body:
+        raise ValueError(f"Could not find body in document: {source}")
 
 
-def load_document_xml(path: Union[str, Path]) -> ET.Element:
-    if os.path.isdir(path):
-        tree = ET.parse(Path(path) / "word" / "document.xml")
-    else:
-        with zipfile.ZipFile(path) as archive:
-            with archive.open("word/document.xml") as doc:
-                tree = ET.parse(doc)
-    return tree.getroot()
+def iter_blocks(source: DocxSource, compact: bool = False) -> Iterator[Dict[str, Any]]:
+    """Stream top-level body blocks, freeing each one once it has been built."""
+    for elem in iter_body_elements(source):
+        builder = BLOCK_BUILDERS.get(elem.tag)
+        if builder is not None:
+            yield builder(elem, compact)
+
+
+def table_cell_texts(table: ET.Element) -> List[List[str]]:
+    """Rows of cell text for a table, without building any per-cell dicts."""
+    rows: List[List[str]] = []
+    for row in table:
+        if row.tag != _TR:
+            continue
+        cells: List[str] = []
+        for cell in row:
+            if cell.tag != _TC:
+                continue
+            texts = [paragraph_text(p) for p in cell if p.tag == _P]
+            cells.append("\n".join(t for t in texts if t).strip())
+        rows.append(cells)
+    return rows
 
 
-def extract_structure(source: Union[str, Path]) -> Dict[str, Any]:
-    document = load_document_xml(source)
-    body = document.find("w:body", NS)
-    if body is None:
-        raise ValueError(f"Could not find body in document: {source}")
-    return {"blocks": read_blocks(body)}
+def iter_table_texts(source: DocxSource) -> Iterator[List[List[str]]]:
+    """Stream top-level tables as rows of cell text, skipping paragraphs entirely."""
+    for elem in iter_body_elements(source):
+        if elem.tag == _TBL:
+            yield table_cell_texts(elem)
+
+
+def extract_structure(source: DocxSource, compact: bool = False) -> Dict[str, Any]:
+    return {"blocks": list(iter_blocks(source, compact))}
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Read the XML structure of a docx without external dependencies."
+        description="Read the XML structure of a docx (uses lxml when installed, else the standard library)."
     )
     parser.add_argument(
         "source",
@@ -116,16 +222,21 @@ def main() -> None:
         "-o",
         help="Optional file path to write the JSON result.",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Only keep the text of paragraphs and table cells (no runs or styles).",
+    )
     args = parser.parse_args()
 
-    structure = extract_structure(args.source)
-    payload = json.dumps(structure, ensure_ascii=False, indent=args.indent)
+    structure = extract_structure(args.source, compact=args.compact)
+    payload = dumps(structure, indent=args.indent)
 
     if args.output:
-        Path(args.output).write_text(payload, encoding="utf-8")
+        Path(args.output).write_bytes(payload)
         print(f"Structured content written to {args.output}")
     else:
-        print(payload)
+        print(payload.decode("utf-8"))
 
 
 if __name__ == "__main__":